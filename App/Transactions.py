@@ -1,5 +1,9 @@
 from sqlalchemy.orm import Session
 from app.models import Transaction, CategoryEnum, Income
+from app.ledger_cache import ledger_cache
+from app import audit
+from app.currency import converted_ledger, normalize_currency, require_rate
+from app.database import BASE_CURRENCY
 from datetime import date
 import matplotlib
 matplotlib.use("Agg")
@@ -17,7 +21,8 @@ def get_categories():
     """
     return [category.name for category in CategoryEnum]
 
-def add_transaction(db: Session, name: str, amount: float, category: CategoryEnum, date_: date):
+def add_transaction(db: Session, name: str, amount: float, category: CategoryEnum, date_: date,
+                    currency: str = BASE_CURRENCY, writer=None):
     """
     Adds a new transaction to the database.
 
@@ -27,21 +32,87 @@ def add_transaction(db: Session, name: str, amount: float, category: CategoryEnu
         amount (float): Transaction amount.
         category (CategoryEnum): Category of the transaction.
         date_ (date): Date of the transaction.
+        currency (str, optional): Currency code of the amount. Defaults to BASE_CURRENCY.
+        writer (GroupCommitWriter, optional): If given, the row is committed
+            in a batch by the writer instead of through db.
 
     Raises:
-        ValueError: If category is not a valid CategoryEnum member.
+        ValueError: If category is not a valid CategoryEnum member, or the
+            currency code is invalid or has no FX rate.
 
     Returns:
         Transaction: The created Transaction object.
     """
     if not isinstance(category, CategoryEnum):
         raise ValueError("Invalid category.")
-    txn = Transaction( name=name, amount=amount, category=category, date=date_)
+    currency = normalize_currency(currency)
+    require_rate(currency)
+    txn = Transaction( name=name, amount=amount, category=category, date=date_, currency=currency)
+    if writer is not None:
+        return writer.add(txn)
     db.add(txn)
+    log_inserts(db, [txn])
     db.commit()
     db.refresh(txn)
+    cache_inserts(db, [txn])
     return txn
 
+def add_income_record(db: Session, amount: float, date_: date, currency: str = BASE_CURRENCY, writer=None):
+    """
+    Adds a new income record to the database.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        amount (float): Income amount.
+        date_ (date): Date of income.
+        currency (str, optional): Currency code of the amount. Defaults to BASE_CURRENCY.
+        writer (GroupCommitWriter, optional): If given, the row is committed
+            in a batch by the writer instead of through db.
+
+    Raises:
+        ValueError: If the currency code is invalid or has no FX rate.
+
+    Returns:
+        Income: The created Income object.
+    """
+    currency = normalize_currency(currency)
+    require_rate(currency)
+    income = Income(amount=amount, date=date_, currency=currency)
+    if writer is not None:
+        return writer.add(income)
+    db.add(income)
+    log_inserts(db, [income])
+    db.commit()
+    db.refresh(income)
+    cache_inserts(db, [income])
+    return income
+
+def log_inserts(db: Session, objs):
+    """
+    Flush new rows and append their audit events, before committing.
+
+    Args:
+        db (Session): SQLAlchemy Session object the rows were added to.
+        objs (List[Transaction or Income]): Rows being inserted.
+    """
+    db.flush()
+    for obj in objs:
+        audit.record_event(db, "insert", obj)
+
+def cache_inserts(db: Session, objs):
+    """
+    Pass committed rows to the ledger cache's write-through hooks.
+
+    Args:
+        db (Session): SQLAlchemy Session object the rows were committed through.
+        objs (List[Transaction or Income]): Committed rows.
+    """
+    for obj in objs:
+        if isinstance(obj, Income):
+            ledger_cache.income_added(db, obj)
+        else:
+            ledger_cache.transaction_added(db, obj)
+
 def get_all_transactions(db):
     """
     Gets all transactions from the database.
@@ -50,25 +121,49 @@ def get_all_transactions(db):
         db (Session): SQLAlchemy Session object.
 
     Returns:
-        List[Transaction]: All Transaction objects.
+        List[Transaction]: All Transaction objects, or cached LedgerRow
+        objects when the ledger cache is enabled.
     """
+    cached = ledger_cache.all_transactions(db)
+    if cached is not None:
+        return cached
     return db.query(Transaction).all()
 
-def get_summary(db: Session):
+def get_all_incomes(db: Session):
+    """
+    Gets all income records, newest first.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+
+    Returns:
+        List[Income]: All Income objects, or cached IncomeRow objects when
+        the ledger cache is enabled.
+    """
+    cached = ledger_cache.all_incomes(db)
+    if cached is not None:
+        return sorted(cached, key=lambda inc: inc.date, reverse=True)
+    return db.query(Income).order_by(Income.date.desc()).all()
+
+def get_summary(db: Session, as_of=None, currency: str = BASE_CURRENCY):
     """
     Calculate total income, total expenses, and net balance.
 
     Args:
         db (Session): SQLAlchemy Session object.
+        as_of (int, date or datetime, optional): Ledger version, day or moment
+            to report on, rebuilt from the audit log. Defaults to now.
+        currency (str, optional): Reporting currency. Defaults to BASE_CURRENCY.
+
+    Raises:
+        ValueError: If the currency is invalid or an FX rate is missing.
 
     Returns:
         dict: Summary with "total_income", "total_expenses", and "net_balance".
     """
-    transactions = db.query(Transaction).all()
-    incomes = db.query(Income).all()
-
-    total_income = sum(inc.amount for inc in incomes)
-    total_expenses = sum(txn.amount for txn in transactions)
+    ledger = converted_ledger(db, currency, as_of)
+    total_income = ledger.total_income()
+    total_expenses = ledger.total_expenses()
 
     net_balance = total_income - total_expenses
 
@@ -89,6 +184,9 @@ def get_by_category(db: Session, category: CategoryEnum):
     Returns:
         List[Transaction]: Transactions matching the category.
     """
+    cached = ledger_cache.by_category(db, category)
+    if cached is not None:
+        return cached
     return db.query(Transaction).filter(Transaction.category == category).all()
 
 def get_daily_budget(db: Session, budget: float, today: date, end_date: date):
@@ -110,18 +208,19 @@ def get_daily_budget(db: Session, budget: float, today: date, end_date: date):
         return 0.0
     return round(budget / days_left, 2)
 
-def get_remaining_budget(db: Session, budget: float):
+def get_remaining_budget(db: Session, budget: float, currency: str = BASE_CURRENCY):
     """
     Calculate remaining budget after total spending.
 
     Args:
         db (Session): SQLAlchemy Session object.
         budget (float): Total budget amount.
+        currency (str, optional): Currency of the budget. Defaults to BASE_CURRENCY.
 
     Returns:
         float: Remaining budget (0 if overspent), rounded to 2 decimals.
     """
-    total_spent = sum(txn.amount for txn in db.query(Transaction).all())
+    total_spent = converted_ledger(db, currency).total_expenses()
     remaining = budget - total_spent
     if remaining < 0:
         remaining = 0
@@ -140,8 +239,10 @@ def delete_transaction(db: Session, transaction_id: int):
     """
     txn = db.query(Transaction).filter(Transaction.id == transaction_id).first()
     if txn:
+        audit.record_event(db, "delete", txn)
         db.delete(txn)
         db.commit()
+        ledger_cache.transaction_deleted(db, transaction_id)
         return True
     return False
 
@@ -160,22 +261,35 @@ def add_income(db: Session, name: str, amount: float, date_: date):
     """
     return add_transaction(db, name, amount, CategoryEnum.INCOME, date_)
 
-def get_spending_pie_chart(db):
+def get_category_totals(db: Session, as_of=None, currency: str = BASE_CURRENCY):
+    """
+    Total spending per category.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        as_of (int, date or datetime, optional): Ledger version, day or moment
+            to report on, rebuilt from the audit log. Defaults to now.
+        currency (str, optional): Reporting currency. Defaults to BASE_CURRENCY.
+
+    Returns:
+        dict: CategoryEnum to total spent, for categories with transactions.
+    """
+    return converted_ledger(db, currency, as_of).category_totals()
+
+def get_spending_pie_chart(db, as_of=None, currency: str = BASE_CURRENCY):
     """
     Makes a pie chart of spending by category.
 
     Args:
         db (Session): SQLAlchemy Session object.
+        as_of (int, date or datetime, optional): Point in time to chart,
+            see get_category_totals().
+        currency (str, optional): Reporting currency. Defaults to BASE_CURRENCY.
 
     Returns:
         str or None: Base64-encoded image of pie chart, or None if no data.
     """
-    transactions = db.query(Transaction).all()
-
-    category_totals = {}
-    for txn in transactions:
-        cat = txn.category.value
-        category_totals[cat] = category_totals.get(cat, 0) + txn.amount
+    category_totals = {cat.value: total for cat, total in get_category_totals(db, as_of, currency).items()}
     
     if not category_totals:
         return None 
@@ -191,25 +305,21 @@ def get_spending_pie_chart(db):
     plt.close()
     return img_base64
 
-def get_daily_spending_chart(db):
+def get_daily_spending_chart(db, currency: str = BASE_CURRENCY):
     """
     Makes a line chart of daily spending.
 
     Args:
         db (Session): SQLAlchemy Session object.
+        currency (str, optional): Reporting currency. Defaults to BASE_CURRENCY.
 
     Returns:
         str or None: Base64-encoded image of line chart, or None if no data.
     """
-    txns = db.query(Transaction).order_by(Transaction.date).all()
-    if not txns:
+    date_totals = converted_ledger(db, currency).daily_totals()
+    if not date_totals:
         return None
 
-    date_totals = {}
-    for txn in txns:
-        d = txn.date
-        date_totals[d] = date_totals.get(d, 0) + txn.amount
-
     dates = sorted(date_totals.keys())
     values = [date_totals[d] for d in dates]
 
@@ -218,7 +328,7 @@ def get_daily_spending_chart(db):
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
     ax.set_title("Daily Spending")
     ax.set_xlabel("Date")
-    ax.set_ylabel("Amount Spent")
+    ax.set_ylabel(f"Amount Spent ({normalize_currency(currency)})")
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
 
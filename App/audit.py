@@ -0,0 +1,280 @@
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database import BASE_CURRENCY
+from app.models import Transaction, CategoryEnum, Income, LedgerEvent, LedgerSnapshot
+
+"""
+Audit log and point-in-time aggregates for the ledger.
+
+Every insert and delete of a transaction or income row appends a LedgerEvent
+in the same database transaction as the change, so the event's version
+numbers give a complete, ordered history. Every LEDGER_SNAPSHOT_EVERY
+versions a LedgerSnapshot saves how the per-day totals changed since the
+previous snapshot, so each snapshot stays small and cheap to write. Every
+LEDGER_FULL_SNAPSHOT_EVERY-th snapshot instead saves the full totals as a
+checkpoint. Answering "as of version or date X" starts from the last
+checkpoint before X, adds up the deltas after it and replays only the events
+after the last snapshot, so it never reads the whole history.
+"""
+
+SNAPSHOT_EVERY = int(os.environ.get("LEDGER_SNAPSHOT_EVERY", "500"))
+FULL_SNAPSHOT_EVERY = int(os.environ.get("LEDGER_FULL_SNAPSHOT_EVERY", "10"))
+
+class LedgerAggregates:
+    """
+    Per-day totals of the ledger at one version.
+
+    Totals are kept in each row's own currency; see app.currency for
+    converting them.
+
+    Attributes:
+        version (int): Ledger version the totals describe.
+        buckets (dict): (entity, category, currency, date) to [total, row count].
+    """
+    __slots__ = ("version", "buckets")
+
+    def __init__(self, version=0, buckets=None):
+        self.version = version
+        self.buckets = buckets or {}
+
+    def apply(self, kind: str, entity: str, amount: float, category: CategoryEnum, currency: str, date_: date):
+        """
+        Apply one event to the totals.
+        """
+        sign = 1 if kind == "insert" else -1
+        self._add((entity, category, currency or BASE_CURRENCY, date_), sign * amount, sign)
+
+    def merge(self, other):
+        """
+        Add another set of totals, e.g. a snapshot delta, to these.
+        """
+        for key, (total, count) in other.buckets.items():
+            self._add(key, total, count)
+
+    def _add(self, key, total, count):
+        # Inside a delta a bucket can net out to no rows but a nonzero total
+        # (one row inserted, another deleted), so it is only dropped once both
+        # are zero.
+        entry = self.buckets.setdefault(key, [0.0, 0])
+        entry[0] += total
+        entry[1] += count
+        if entry[1] == 0 and abs(entry[0]) < 1e-9:
+            del self.buckets[key]
+
+    def rows(self):
+        """
+        Returns:
+            List[tuple]: (entity, category, currency, date, total) per bucket
+            that still holds rows.
+        """
+        return [key + (total,) for key, (total, count) in self.buckets.items() if count]
+
+    def compact(self):
+        """
+        Drop buckets that hold no rows. Only valid for full aggregates.
+        """
+        self.buckets = {key: entry for key, entry in self.buckets.items() if entry[1]}
+        return self
+
+    def to_json(self):
+        return json.dumps([
+            [entity, category.name if category else None, currency, d.isoformat(), total, count]
+            for (entity, category, currency, d), (total, count) in self.buckets.items()
+        ])
+
+    @classmethod
+    def from_json(cls, version: int, data: str):
+        buckets = {}
+        for entity, category, currency, d, total, count in json.loads(data):
+            key = (entity, CategoryEnum[category] if category else None, currency, date.fromisoformat(d))
+            buckets[key] = [total, count]
+        return cls(version, buckets)
+
+def record_event(db: Session, kind: str, obj):
+    """
+    Append an insert or delete event for a transaction or income row.
+
+    The row must already have an id (flush before calling for inserts). The
+    event is added to db and committed together with the change itself.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        kind (str): "insert" or "delete".
+        obj (Transaction or Income): The affected row.
+
+    Returns:
+        LedgerEvent: The new event, with its version set.
+    """
+    is_income = isinstance(obj, Income)
+    event = LedgerEvent(
+        kind=kind,
+        entity="income" if is_income else "transaction",
+        entity_id=obj.id,
+        amount=obj.amount,
+        category=None if is_income else obj.category,
+        date=obj.date,
+        currency=obj.currency or BASE_CURRENCY,
+        recorded_at=datetime.now(),
+    )
+    db.add(event)
+    db.flush()
+    if SNAPSHOT_EVERY > 0 and event.version % SNAPSHOT_EVERY == 0:
+        take_snapshot(db, event.version)
+    return event
+
+def take_snapshot(db: Session, version: int):
+    """
+    Save how the aggregates changed since the previous snapshot, or the full
+    aggregates once LEDGER_FULL_SNAPSHOT_EVERY snapshots have passed since the
+    last full one.
+
+    A delta only reads the events since the previous snapshot, so its cost is
+    bounded by LEDGER_SNAPSHOT_EVERY rather than by the size of the history.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        version (int): Ledger version to snapshot.
+
+    Returns:
+        LedgerSnapshot: The new snapshot, added to db.
+    """
+    checkpoint = _last_checkpoint(db, version - 1)
+    since_checkpoint = (
+        db.query(func.count(LedgerSnapshot.version))
+        .filter(LedgerSnapshot.version > (checkpoint if checkpoint is not None else -1))
+        .filter(LedgerSnapshot.version < version)
+        .scalar()
+    )
+    full = FULL_SNAPSHOT_EVERY > 0 and since_checkpoint + 1 >= FULL_SNAPSHOT_EVERY
+    if full:
+        agg = aggregates_as_of(db, version).compact()
+    else:
+        previous = (
+            db.query(func.max(LedgerSnapshot.version))
+            .filter(LedgerSnapshot.version < version)
+            .scalar()
+        )
+        agg = _replay(db, LedgerAggregates(previous or 0), version)
+    snapshot = LedgerSnapshot(version=version, created_at=datetime.now(), full=full, buckets=agg.to_json())
+    db.add(snapshot)
+    db.flush()
+    return snapshot
+
+def ensure_baseline(db: Session):
+    """
+    Snapshot rows that predate the audit log as version 0.
+
+    Does nothing once any event or snapshot exists, so it is safe to call on
+    every startup.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+    """
+    if db.query(LedgerEvent.version).first() or db.query(LedgerSnapshot.version).first():
+        return
+    agg = LedgerAggregates()
+    txns = db.query(Transaction.amount, Transaction.category, Transaction.currency, Transaction.date)
+    for amount, category, currency, d in txns:
+        agg.apply("insert", "transaction", amount, category, currency, d)
+    for amount, currency, d in db.query(Income.amount, Income.currency, Income.date):
+        agg.apply("insert", "income", amount, None, currency, d)
+    if not agg.buckets:
+        return
+    db.add(LedgerSnapshot(version=0, created_at=datetime.now(), full=True, buckets=agg.to_json()))
+    db.commit()
+
+def current_version(db: Session):
+    """
+    Returns:
+        int: Latest ledger version, 0 if nothing has been recorded.
+    """
+    return db.query(func.max(LedgerEvent.version)).scalar() or 0
+
+def state_token(db: Session):
+    """
+    Cheap fingerprint of the ledger's current contents, for cache keys.
+
+    Returns:
+        tuple: Latest version and the time it was recorded.
+    """
+    latest = (
+        db.query(LedgerEvent.version, LedgerEvent.recorded_at)
+        .order_by(LedgerEvent.version.desc())
+        .first()
+    )
+    return tuple(latest) if latest else (0, None)
+
+def resolve_version(db: Session, as_of):
+    """
+    Turn an "as of" value into a ledger version.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        as_of (int, date, datetime or None): A version number, the end of a
+            day, an exact moment, or None for the latest version.
+
+    Returns:
+        int: The last version recorded at or before as_of.
+    """
+    if as_of is None:
+        return current_version(db)
+    if isinstance(as_of, int):
+        return as_of
+    if not isinstance(as_of, datetime):
+        as_of = datetime.combine(as_of + timedelta(days=1), time.min) - timedelta(microseconds=1)
+    return db.query(func.max(LedgerEvent.version)).filter(LedgerEvent.recorded_at <= as_of).scalar() or 0
+
+def aggregates_as_of(db: Session, version: int):
+    """
+    Rebuild the ledger totals at a version from the last full snapshot and
+    the deltas after it.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        version (int): Ledger version to rebuild.
+
+    Returns:
+        LedgerAggregates: Totals as of that version.
+    """
+    agg = LedgerAggregates()
+    checkpoint = _last_checkpoint(db, version)
+    snapshots = (
+        db.query(LedgerSnapshot.version, LedgerSnapshot.buckets)
+        .filter(LedgerSnapshot.version >= (checkpoint or 0), LedgerSnapshot.version <= version)
+        .order_by(LedgerSnapshot.version)
+    )
+    for snap_version, buckets in snapshots:
+        agg.merge(LedgerAggregates.from_json(snap_version, buckets))
+        agg.version = snap_version
+    return _replay(db, agg, version)
+
+def _last_checkpoint(db: Session, version: int):
+    """
+    Returns:
+        int or None: Version of the last full snapshot at or before version.
+    """
+    return (
+        db.query(func.max(LedgerSnapshot.version))
+        .filter(LedgerSnapshot.full.is_(True), LedgerSnapshot.version <= version)
+        .scalar()
+    )
+
+def _replay(db: Session, agg: LedgerAggregates, version: int):
+    """
+    Apply the events after agg.version, up to and including version.
+    """
+    events = (
+        db.query(
+            LedgerEvent.kind, LedgerEvent.entity, LedgerEvent.amount,
+            LedgerEvent.category, LedgerEvent.currency, LedgerEvent.date,
+        )
+        .filter(LedgerEvent.version > agg.version, LedgerEvent.version <= version)
+        .order_by(LedgerEvent.version)
+    )
+    for kind, entity, amount, category, currency, d in events:
+        agg.apply(kind, entity, amount, category, currency, d)
+    agg.version = version
+    return agg
@@ -0,0 +1,317 @@
+import csv
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+import numpy as np
+from sqlalchemy import func, inspect, text
+from sqlalchemy.orm import Session
+from app.database import BASE_CURRENCY
+from app.models import Transaction, CategoryEnum, Income
+from app import audit
+from app.ledger_cache import ledger_cache
+
+"""
+Multi-currency support.
+
+Every transaction and income row stores its own currency. Amounts are only
+converted when they are aggregated: rows are first summed per day, category
+and currency, and those daily totals are then converted in one vectorized
+lookup against a local table of date-indexed FX rates.
+
+The rates come from the CSV file named by FX_RATES_FILE (default
+fx_rates.csv), with columns date,currency,rate, where rate is the value of
+one unit of the currency in BASE_CURRENCY on that date. The file is reloaded
+when it changes. A conversion uses the latest rate on or before the day
+(or the earliest rate for days before the table starts).
+
+Converted aggregates are memoized per ledger version and reporting currency,
+so repeated dashboard requests do not redo the conversion. When the ledger
+cache is loaded, the daily totals and memo keys come from it and no SQL is
+run at all.
+"""
+
+FX_RATES_FILE = os.environ.get("FX_RATES_FILE", "fx_rates.csv")
+MEMO_SIZE = 16
+
+def normalize_currency(code):
+    """
+    Validate and normalize a currency code.
+
+    Args:
+        code (str or None): Currency code, e.g. "usd". None means BASE_CURRENCY.
+
+    Raises:
+        ValueError: If the code is not three letters.
+
+    Returns:
+        str: Upper-case currency code.
+    """
+    if code is None:
+        return BASE_CURRENCY
+    code = code.strip().upper()
+    if len(code) != 3 or not code.isalpha():
+        raise ValueError("Invalid currency.")
+    return code
+
+class FxRates:
+    """
+    Date-indexed FX rates loaded from a CSV file.
+    """
+
+    def __init__(self, path: str = FX_RATES_FILE):
+        """
+        Args:
+            path (str): CSV file with date,currency,rate columns.
+        """
+        self.path = path
+        self.version = None
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Reload the rates if the file changed since the last load.
+
+        Returns:
+            The file's modification time, used as the table version.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        with self._lock:
+            if mtime != self.version:
+                self._tables = self._load() if mtime is not None else {}
+                self.version = mtime
+        return self.version
+
+    def _load(self):
+        rows = {}
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                currency = normalize_currency(row["currency"])
+                day = date.fromisoformat(row["date"].strip()).toordinal()
+                rows.setdefault(currency, []).append((day, float(row["rate"])))
+        tables = {}
+        for currency, pairs in rows.items():
+            pairs.sort()
+            tables[currency] = (
+                np.array([d for d, _ in pairs], dtype=np.int64),
+                np.array([r for _, r in pairs], dtype=np.float64),
+            )
+        return tables
+
+    def has_rate(self, currency: str):
+        """
+        Returns:
+            bool: True if amounts in the currency can be converted.
+        """
+        self.refresh()
+        return currency == BASE_CURRENCY or currency in self._tables
+
+    def rates(self, currency: str, days):
+        """
+        Look up rates to BASE_CURRENCY for many days at once.
+
+        Args:
+            currency (str): Currency code.
+            days (np.ndarray): Day ordinals (date.toordinal()).
+
+        Raises:
+            ValueError: If there are no rates for the currency.
+
+        Returns:
+            np.ndarray: Rate for each day.
+        """
+        if currency == BASE_CURRENCY:
+            return np.ones(len(days))
+        table = self._tables.get(currency)
+        if table is None:
+            raise ValueError(f"No FX rate for {currency}.")
+        table_days, table_rates = table
+        idx = np.searchsorted(table_days, days, side="right") - 1
+        return table_rates[np.clip(idx, 0, None)]
+
+    def convert(self, amounts, currencies, days, to_currency: str):
+        """
+        Convert amounts from their own currencies to to_currency.
+
+        Args:
+            amounts (np.ndarray): Amounts to convert.
+            currencies (np.ndarray): Currency code of each amount.
+            days (np.ndarray): Day ordinal of each amount.
+            to_currency (str): Currency to convert into.
+
+        Returns:
+            np.ndarray: Converted amounts.
+        """
+        self.refresh()
+        to_base = np.empty(len(amounts))
+        for currency in np.unique(currencies):
+            mask = currencies == currency
+            to_base[mask] = self.rates(currency, days[mask])
+        return amounts * to_base / self.rates(to_currency, days)
+
+fx_rates = FxRates()
+
+def require_rate(currency: str):
+    """
+    Check that a currency can be converted before storing amounts in it.
+
+    Args:
+        currency (str): Normalized currency code.
+
+    Raises:
+        ValueError: If the rates file has no rate for the currency.
+    """
+    if not fx_rates.has_rate(currency):
+        raise ValueError(f"No FX rate for {currency}.")
+
+class ConvertedLedger:
+    """
+    Daily ledger totals converted into one reporting currency.
+
+    Attributes:
+        currency (str): Reporting currency.
+        total_income_amount (float): Sum of all income.
+        categories (List[CategoryEnum]): Category of each expense bucket.
+        days (np.ndarray): Day ordinal of each expense bucket.
+        amounts (np.ndarray): Converted total of each expense bucket.
+    """
+
+    def __init__(self, rows, currency: str, rates: FxRates):
+        """
+        Args:
+            rows: (entity, category, currency, date, total) tuples.
+            currency (str): Reporting currency.
+            rates (FxRates): Rates to convert with.
+        """
+        self.currency = currency
+        if rows:
+            entities, categories, currencies, dates, totals = zip(*rows)
+        else:
+            entities, categories, currencies, dates, totals = (), (), (), (), ()
+        days = np.array([d.toordinal() for d in dates], dtype=np.int64)
+        converted = rates.convert(
+            np.array(totals, dtype=np.float64), np.array(currencies, dtype=object), days, currency,
+        )
+        is_income = np.array([e == "income" for e in entities], dtype=bool)
+        self.total_income_amount = float(converted[is_income].sum())
+        self.categories = [c for c, inc in zip(categories, is_income) if not inc]
+        self.days = days[~is_income]
+        self.amounts = converted[~is_income]
+
+    def total_income(self):
+        return self.total_income_amount
+
+    def total_expenses(self):
+        return float(self.amounts.sum())
+
+    def category_totals(self):
+        """
+        Returns:
+            dict: CategoryEnum to total spent, in CategoryEnum order.
+        """
+        totals = {}
+        for category, amount in zip(self.categories, self.amounts):
+            totals[category] = totals.get(category, 0.0) + amount
+        return {cat: round(float(totals[cat]), 2) for cat in CategoryEnum if cat in totals}
+
+    def daily_totals(self):
+        """
+        Returns:
+            dict: date to total spent, in date order.
+        """
+        unique_days, inverse = np.unique(self.days, return_inverse=True)
+        sums = np.bincount(inverse, weights=self.amounts, minlength=len(unique_days))
+        return {date.fromordinal(int(d)): float(s) for d, s in zip(unique_days, sums)}
+
+def daily_rows(db: Session):
+    """
+    Sum the current ledger per day, category and currency in SQL.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+
+    Returns:
+        List[tuple]: (entity, category, currency, date, total) per group.
+    """
+    txn_rows = db.query(
+        Transaction.category, Transaction.currency, Transaction.date, func.sum(Transaction.amount),
+    ).group_by(Transaction.category, Transaction.currency, Transaction.date)
+    income_rows = db.query(
+        Income.currency, Income.date, func.sum(Income.amount),
+    ).group_by(Income.currency, Income.date)
+    return (
+        [("transaction", cat, cur, d, total) for cat, cur, d, total in txn_rows]
+        + [("income", None, cur, d, total) for cur, d, total in income_rows]
+    )
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+def converted_ledger(db: Session, currency: str = None, as_of=None):
+    """
+    Daily ledger totals in a reporting currency, memoized.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        currency (str, optional): Reporting currency. Defaults to BASE_CURRENCY.
+        as_of (int, date or datetime, optional): Ledger version, day or moment
+            to report on, rebuilt from the audit log. Defaults to now.
+
+    Raises:
+        ValueError: If the currency is invalid or a needed rate is missing.
+
+    Returns:
+        ConvertedLedger: Converted totals.
+    """
+    currency = normalize_currency(currency)
+    version = audit.resolve_version(db, as_of) if as_of is not None else None
+    generation = ledger_cache.generation(db) if version is None else None
+    state = ("cache", generation) if generation is not None else audit.state_token(db)
+    key = (db.get_bind(), state, version, currency, fx_rates.refresh())
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+
+    cached = ledger_cache.daily_rows(db) if generation is not None else None
+    if version is not None:
+        rows = audit.aggregates_as_of(db, version).rows()
+    elif cached is not None:
+        generation, rows = cached
+        key = (key[0], ("cache", generation)) + key[2:]
+    else:
+        rows = daily_rows(db)
+    ledger = ConvertedLedger(rows, currency, fx_rates)
+
+    with _memo_lock:
+        _memo[key] = ledger
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return ledger
+
+def upgrade_schema(engine):
+    """
+    Add the currency and snapshot columns to tables created before they existed.
+
+    Existing rows are assumed to be in BASE_CURRENCY, and existing snapshots
+    to be deltas.
+
+    Args:
+        engine: SQLAlchemy engine.
+    """
+    columns = [
+        ("transactions", "currency", f"VARCHAR(3) NOT NULL DEFAULT '{BASE_CURRENCY}'"),
+        ("income", "currency", f"VARCHAR(3) NOT NULL DEFAULT '{BASE_CURRENCY}'"),
+        ("ledger_events", "currency", f"VARCHAR(3) NOT NULL DEFAULT '{BASE_CURRENCY}'"),
+        ("ledger_snapshots", "full", "BOOLEAN NOT NULL DEFAULT 0"),
+    ]
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+    with engine.begin() as conn:
+        for table, column, ddl in columns:
+            if table in tables and column not in [c["name"] for c in inspector.get_columns(table)]:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
@@ -1,6 +1,12 @@
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-engine = create_engine('sqlite:///finance.db', echo=True)
+DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///finance.db")
+BASE_CURRENCY = os.environ.get("BASE_CURRENCY", "USD")
+# Set DATABASE_ECHO=0 to stop logging every SQL statement
+DATABASE_ECHO = os.environ.get("DATABASE_ECHO", "1") != "0"
+
+engine = create_engine(DATABASE_URL, echo=DATABASE_ECHO)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
\ No newline at end of file
@@ -0,0 +1,148 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from app.transactions import log_inserts, cache_inserts
+from app.ledger_cache import ledger_cache
+
+"""
+Optional group-commit writer for high-rate inserts.
+
+Instead of committing each new row on its own, callers hand rows to a single
+background writer thread. The writer collects rows for up to
+GROUP_COMMIT_MS milliseconds or GROUP_COMMIT_MAX_ROWS rows and commits them
+in one transaction, so a burst of inserts pays for one SQLite commit instead
+of one per row. Each caller blocks until its row's batch has committed, so a
+returned id is always durable.
+
+Set GROUP_COMMIT_MS to a positive value to enable it (0, the default,
+disables it).
+"""
+
+GROUP_COMMIT_MS = int(os.environ.get("GROUP_COMMIT_MS", "0"))
+GROUP_COMMIT_MAX_ROWS = int(os.environ.get("GROUP_COMMIT_MAX_ROWS", "100"))
+
+_STOP = object()
+
+class GroupCommitWriter:
+    """
+    Background thread that batches inserts into shared commits.
+    """
+
+    def __init__(self, session_factory, max_delay_ms: int = GROUP_COMMIT_MS, max_rows: int = GROUP_COMMIT_MAX_ROWS):
+        """
+        Args:
+            session_factory: sessionmaker used to open the writer's sessions.
+            max_delay_ms (int): Longest time a row waits for its batch to fill.
+            max_rows (int): Largest number of rows committed in one batch.
+        """
+        self.session_factory = session_factory
+        self.max_delay = max_delay_ms / 1000
+        self.max_rows = max_rows
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, obj):
+        """
+        Queue a new Transaction or Income for insertion.
+
+        Args:
+            obj (Transaction or Income): Unsaved model instance.
+
+        Returns:
+            Future: Resolves to the row's id once its batch has committed, or
+            raises the error that made the commit fail.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((obj, future))
+        return future
+
+    def add(self, obj):
+        """
+        Insert a row through the writer and wait for it to commit.
+
+        Args:
+            obj (Transaction or Income): Unsaved model instance.
+
+        Returns:
+            Transaction or Income: The same object, with its id set.
+        """
+        self.submit(obj).result()
+        return obj
+
+    def close(self):
+        """
+        Commit everything still queued and stop the writer thread.
+        """
+        with self._start_lock:
+            if self._thread is None:
+                return
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        """
+        Commit a batch in one transaction and resolve its futures.
+
+        If the batch fails to commit, each row is retried on its own so one
+        bad row does not fail the rest. Nothing after the commit is retried,
+        so a committed row is never inserted or logged twice.
+        """
+        objs = [obj for obj, _ in batch]
+        db = self.session_factory(expire_on_commit=False)
+        try:
+            db.add_all(objs)
+            log_inserts(db, objs)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            db.expunge_all()
+            db.close()
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            for item in batch:
+                self._flush([item])
+            return
+
+        try:
+            cache_inserts(db, objs)
+        except Exception:
+            # The rows are committed; make the cache reload them from the database
+            ledger_cache.reset()
+        finally:
+            db.close()
+            for obj, future in batch:
+                future.set_result(obj.id)
@@ -1,9 +1,11 @@
 from app.database import Base, engine
 from app.models import Transaction
+from app.currency import upgrade_schema
 
 """
 Initializes the database by creating all tables defined in the models.
 Should be run once during setup.
 """
 
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
\ No newline at end of file
@@ -0,0 +1,292 @@
+import itertools
+import os
+import threading
+from sqlalchemy.orm import Session
+from app.models import Transaction, CategoryEnum, Income
+
+"""
+Optional in-process cache of the ledger.
+
+Keeps a compact copy of every transaction and income row in memory, indexed
+by id, category and date, so read-heavy pages (listings, the summary, charts
+and budget) can skip SQL and ORM object creation. It is kept in sync by
+write-through hooks in the write helpers.
+
+Enable it by setting LEDGER_CACHE_MAX_ROWS to the maximum number of rows to
+hold (0, the default, disables it). Once the ledger grows past the cap the
+cache drops its rows and every read falls back to SQL.
+
+The cache lives in a single process, so it is only coherent when all writes
+go through this app in one worker.
+"""
+
+DEFAULT_MAX_ROWS = int(os.environ.get("LEDGER_CACHE_MAX_ROWS", "0"))
+
+class LedgerRow:
+    """
+    Lightweight, read-only stand-in for a Transaction row.
+
+    Attributes:
+        id (int): Primary key.
+        name (str): Name or description of the transaction.
+        amount (float): Amount of the transaction.
+        category (CategoryEnum): Category of the transaction.
+        date (date): Date of the transaction.
+        currency (str): Currency of the amount.
+    """
+    __slots__ = ("id", "name", "amount", "category", "date", "currency")
+
+    def __init__(self, id, name, amount, category, date, currency):
+        self.id = id
+        self.name = name
+        self.amount = amount
+        self.category = category
+        self.date = date
+        self.currency = currency
+
+class IncomeRow:
+    """
+    Lightweight, read-only stand-in for an Income row.
+
+    Attributes:
+        id (int): Primary key.
+        amount (float): Income amount.
+        date (date): Date of income.
+        currency (str): Currency of the amount.
+    """
+    __slots__ = ("id", "amount", "date", "currency")
+
+    def __init__(self, id, amount, date, currency):
+        self.id = id
+        self.amount = amount
+        self.date = date
+        self.currency = currency
+
+def _to_category(category):
+    """
+    Normalize a category given as an enum, member name or value.
+
+    Args:
+        category (CategoryEnum or str): Category to normalize.
+
+    Returns:
+        CategoryEnum or None: Matching category, or None if unknown.
+    """
+    if isinstance(category, CategoryEnum):
+        return category
+    try:
+        return CategoryEnum[category]
+    except KeyError:
+        pass
+    try:
+        return CategoryEnum(category)
+    except ValueError:
+        return None
+
+class LedgerCache:
+    """
+    Read-through cache of transactions and incomes with write-through updates.
+
+    The cache loads lazily on the first read through a session, and is bound
+    to that session's engine; reads through a different engine reload it.
+    """
+
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS):
+        """
+        Args:
+            max_rows (int): Maximum number of rows to hold. 0 disables the cache.
+        """
+        self.max_rows = max_rows
+        self._lock = threading.RLock()
+        self._generations = itertools.count(1)
+        self.reset()
+
+    def reset(self):
+        """
+        Drop all cached rows. The next read reloads from the database.
+        """
+        with self._lock:
+            self._generation = next(self._generations)
+            self._bind = None
+            self._loaded = False
+            self._overflowed = False
+            self._by_id = {}
+            self._by_category = {}
+            self._by_date = {}
+            self._incomes = {}
+
+    @property
+    def enabled(self):
+        return self.max_rows > 0
+
+    def _size(self):
+        return len(self._by_id) + len(self._incomes)
+
+    def _overflow(self):
+        """
+        Give up caching once the ledger no longer fits under the cap.
+        """
+        self._by_id = {}
+        self._by_category = {}
+        self._by_date = {}
+        self._incomes = {}
+        self._overflowed = True
+        self._generation = next(self._generations)
+
+    def _load(self, db: Session):
+        """
+        Load the whole ledger from the database as plain column tuples.
+        """
+        bind = db.get_bind()
+        self.reset()
+        self._bind = bind
+        self._loaded = True
+
+        txn_rows = db.query(
+            Transaction.id, Transaction.name, Transaction.amount,
+            Transaction.category, Transaction.date, Transaction.currency,
+        ).order_by(Transaction.id).limit(self.max_rows + 1).all()
+        income_rows = db.query(
+            Income.id, Income.amount, Income.date, Income.currency,
+        ).order_by(Income.id).limit(self.max_rows + 1).all()
+
+        if len(txn_rows) + len(income_rows) > self.max_rows:
+            self._overflow()
+            return
+
+        for row in txn_rows:
+            self._insert(LedgerRow(*row))
+        for row in income_rows:
+            self._incomes[row.id] = IncomeRow(*row)
+
+    def _insert(self, row: LedgerRow):
+        self._generation = next(self._generations)
+        self._by_id[row.id] = row
+        self._by_category.setdefault(row.category, {})[row.id] = row
+        self._by_date.setdefault(row.date, {})[row.id] = row
+
+    def _ready(self, db: Session):
+        """
+        Make sure the cache is loaded for this session's engine.
+
+        Returns:
+            bool: True if reads can be served from memory.
+        """
+        if not self.enabled:
+            return False
+        if not self._loaded or self._bind is not db.get_bind():
+            self._load(db)
+        return not self._overflowed
+
+    # ----------------- WRITE-THROUGH HOOKS -------------------
+
+    def transaction_added(self, db: Session, txn: Transaction):
+        """
+        Record a committed transaction.
+        """
+        with self._lock:
+            if not self._loaded or self._overflowed or self._bind is not db.get_bind():
+                return
+            if self._size() >= self.max_rows:
+                self._overflow()
+                return
+            self._insert(LedgerRow(txn.id, txn.name, txn.amount, txn.category, txn.date, txn.currency))
+
+    def transaction_deleted(self, db: Session, transaction_id: int):
+        """
+        Forget a committed transaction deletion.
+        """
+        with self._lock:
+            if not self._loaded or self._overflowed or self._bind is not db.get_bind():
+                return
+            row = self._by_id.pop(transaction_id, None)
+            if row is None:
+                return
+            self._generation = next(self._generations)
+            for index, key in ((self._by_category, row.category), (self._by_date, row.date)):
+                bucket = index[key]
+                del bucket[transaction_id]
+                if not bucket:
+                    del index[key]
+
+    def income_added(self, db: Session, income: Income):
+        """
+        Record a committed income row.
+        """
+        with self._lock:
+            if not self._loaded or self._overflowed or self._bind is not db.get_bind():
+                return
+            if self._size() >= self.max_rows:
+                self._overflow()
+                return
+            self._generation = next(self._generations)
+            self._incomes[income.id] = IncomeRow(income.id, income.amount, income.date, income.currency)
+
+    # ----------------- READS -------------------
+    # Each read returns None when the cache cannot answer, so callers fall
+    # back to SQL.
+
+    def all_transactions(self, db: Session):
+        """
+        Returns:
+            List[LedgerRow] or None: All transactions in id order.
+        """
+        with self._lock:
+            if not self._ready(db):
+                return None
+            return list(self._by_id.values())
+
+    def by_category(self, db: Session, category):
+        """
+        Returns:
+            List[LedgerRow] or None: Transactions in the category, in id order.
+        """
+        with self._lock:
+            if not self._ready(db):
+                return None
+            return list(self._by_category.get(_to_category(category), {}).values())
+
+    def all_incomes(self, db: Session):
+        """
+        Returns:
+            List[IncomeRow] or None: All income rows in id order.
+        """
+        with self._lock:
+            if not self._ready(db):
+                return None
+            return list(self._incomes.values())
+
+    def generation(self, db: Session):
+        """
+        Returns:
+            int or None: Number that changes whenever the cached ledger
+            changes, for use in cache keys.
+        """
+        with self._lock:
+            if not self._ready(db):
+                return None
+            return self._generation
+
+    def daily_rows(self, db: Session):
+        """
+        Sum the cached ledger per day, category and currency.
+
+        Returns:
+            tuple or None: (generation, rows), where rows are
+            (entity, category, currency, date, total) tuples as returned by
+            app.currency.daily_rows().
+        """
+        with self._lock:
+            if not self._ready(db):
+                return None
+            totals = {}
+            for d, rows in self._by_date.items():
+                for row in rows.values():
+                    key = ("transaction", row.category, row.currency, d)
+                    totals[key] = totals.get(key, 0.0) + row.amount
+            for inc in self._incomes.values():
+                key = ("income", None, inc.currency, inc.date)
+                totals[key] = totals.get(key, 0.0) + inc.amount
+            return self._generation, [key + (total,) for key, total in totals.items()]
+
+ledger_cache = LedgerCache()
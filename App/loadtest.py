@@ -0,0 +1,318 @@
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, Transaction, CategoryEnum, Income
+
+"""
+Load generator for the FastAPI app.
+
+Seeds a scratch SQLite database, starts uvicorn on it, replays a weighted mix
+of requests from concurrent clients, and prints per-route latency, throughput
+and error counts. Run it with:
+
+    make loadtest
+    PYTHONPATH=. python3 app/loadtest.py --requests 5000 --concurrency 32
+
+Pass --url to run against a server that is already running instead. Lock
+errors are then only counted on routes that put the error text in their
+response.
+"""
+
+ROUTES = ["add", "add_income", "summary", "transactions", "category", "delete"]
+DEFAULT_MIX = "add=4,add_income=1,summary=2,transactions=2,category=2,delete=1"
+LOCK_ERROR = "database is locked"
+
+def parse_mix(mix: str):
+    """
+    Parse a route mix such as "add=4,summary=2" into weights.
+
+    Args:
+        mix (str): Comma-separated route=weight pairs.
+
+    Raises:
+        ValueError: If a route is unknown or a weight is not a positive integer.
+
+    Returns:
+        dict: Route name to weight.
+    """
+    weights = {}
+    for part in mix.split(","):
+        route, _, weight = part.strip().partition("=")
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route: {route}")
+        if not weight.isdigit() or int(weight) <= 0:
+            raise ValueError(f"Invalid weight for {route}: {weight}")
+        weights[route] = int(weight)
+    return weights
+
+def percentile(values, pct: float):
+    """
+    Nearest-rank percentile of a list of numbers.
+
+    Args:
+        values (List[float]): Samples.
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile, or 0.0 if there are no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+def seed_database(url: str, n_transactions: int, n_incomes: int):
+    """
+    Create the tables and fill them with random transactions and incomes.
+
+    Args:
+        url (str): SQLAlchemy database URL.
+        n_transactions (int): Number of transactions to insert.
+        n_incomes (int): Number of income records to insert.
+
+    Returns:
+        List[int]: IDs of the seeded transactions.
+    """
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    start = date.today() - timedelta(days=90)
+    categories = list(CategoryEnum)
+    db.add_all(
+        Transaction(
+            name=f"Seed {i}",
+            amount=round(random.uniform(1, 200), 2),
+            category=random.choice(categories),
+            date=start + timedelta(days=random.randrange(90)),
+        )
+        for i in range(n_transactions)
+    )
+    db.add_all(
+        Income(amount=round(random.uniform(500, 3000), 2), date=start + timedelta(days=random.randrange(90)))
+        for _ in range(n_incomes)
+    )
+    db.commit()
+    ids = [row.id for row in db.query(Transaction.id).all()]
+    db.close()
+    engine.dispose()
+    return ids
+
+def build_request(route: str, deletable):
+    """
+    Build the HTTP method, path and form data for one request.
+
+    Args:
+        route (str): Route name from ROUTES.
+        deletable (List[int]): Transaction IDs not yet deleted.
+
+    Returns:
+        tuple or None: (method, path, data), or None if the route has nothing to do.
+    """
+    today = date.today().isoformat()
+    if route == "add":
+        category = random.choice(list(CategoryEnum))
+        return "POST", "/add", {
+            "name": "Load test",
+            "amount": round(random.uniform(1, 100), 2),
+            "category": category.value,
+            "date": today,
+        }
+    if route == "add_income":
+        return "POST", "/add_income", {"amount": round(random.uniform(100, 1000), 2), "date_": today}
+    if route == "summary":
+        return "GET", "/summary", None
+    if route == "transactions":
+        return "GET", "/transactions", None
+    if route == "category":
+        return "POST", "/category", {"category": random.choice(list(CategoryEnum)).name}
+    if route == "delete":
+        if not deletable:
+            return None
+        return "POST", "/delete", {"id": deletable.pop(random.randrange(len(deletable)))}
+
+async def run_load(base_url: str, weights: dict, n_requests: int, concurrency: int, deletable):
+    """
+    Send n_requests requests from concurrency clients and record the results.
+
+    Args:
+        base_url (str): Server URL, e.g. "http://127.0.0.1:8001".
+        weights (dict): Route name to weight, from parse_mix().
+        n_requests (int): Total number of requests to send.
+        concurrency (int): Number of concurrent clients.
+        deletable (List[int]): Transaction IDs the delete route may use. Once
+            they run out, delete is dropped from the mix.
+
+    Returns:
+        tuple: (stats, elapsed) where stats maps route name to a dict with
+        "latencies", "errors" and "lock_errors", and elapsed is in seconds.
+    """
+    routes = list(weights)
+    route_weights = [weights[r] for r in routes]
+    stats = {r: {"latencies": [], "errors": 0, "lock_errors": 0} for r in routes}
+    remaining = [n_requests]
+
+    async def client_loop(client):
+        while remaining[0] > 0 and routes:
+            route = random.choices(routes, route_weights)[0]
+            request = build_request(route, deletable)
+            if request is None:
+                i = routes.index(route)
+                del routes[i], route_weights[i]
+                continue
+            remaining[0] -= 1
+            method, path, data = request
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, data=data)
+                failed = response.status_code >= 400
+                locked = LOCK_ERROR in response.text
+            except httpx.HTTPError as e:
+                failed = True
+                locked = LOCK_ERROR in str(e)
+            stats[route]["latencies"].append(time.perf_counter() - started)
+            stats[route]["errors"] += failed
+            stats[route]["lock_errors"] += locked
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return stats, elapsed
+
+def format_report(stats: dict, elapsed: float):
+    """
+    Format per-route results as a text table.
+
+    Args:
+        stats (dict): Results from run_load().
+        elapsed (float): Wall-clock duration of the run in seconds.
+
+    Returns:
+        str: The report.
+    """
+    header = f"{'route':<14}{'count':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'locked':>8}"
+    lines = [header, "-" * len(header)]
+    all_latencies = []
+    total_errors = total_locked = 0
+    for route, s in stats.items():
+        lat = s["latencies"]
+        all_latencies.extend(lat)
+        total_errors += s["errors"]
+        total_locked += s["lock_errors"]
+        lines.append(
+            f"{route:<14}{len(lat):>8}{len(lat) / elapsed:>10.1f}"
+            f"{percentile(lat, 50) * 1000:>10.1f}{percentile(lat, 95) * 1000:>10.1f}"
+            f"{percentile(lat, 99) * 1000:>10.1f}{s['errors']:>8}{s['lock_errors']:>8}"
+        )
+    lines.append("-" * len(header))
+    lines.append(
+        f"{'total':<14}{len(all_latencies):>8}{len(all_latencies) / elapsed:>10.1f}"
+        f"{percentile(all_latencies, 50) * 1000:>10.1f}{percentile(all_latencies, 95) * 1000:>10.1f}"
+        f"{percentile(all_latencies, 99) * 1000:>10.1f}{total_errors:>8}{total_locked:>8}"
+    )
+    return "\n".join(lines)
+
+def create_app():
+    """
+    Build app.main:app for a load-test run.
+
+    Adds an exception handler that returns the error text in the 500 body,
+    so the client can count lock errors on every route, not just the ones
+    that report their own errors.
+
+    Returns:
+        FastAPI: The app.
+    """
+    from fastapi.responses import PlainTextResponse
+    from app.main import app
+
+    def show_error(request, exc):
+        return PlainTextResponse(f"{type(exc).__name__}: {exc}", status_code=500)
+
+    app.add_exception_handler(Exception, show_error)
+    return app
+
+def start_server(db_url: str, port: int, log_file):
+    """
+    Start uvicorn for create_app() on the given database and wait until it answers.
+
+    SQL echo is turned off so logging does not add to the measured latencies.
+
+    Args:
+        db_url (str): SQLAlchemy database URL passed as DATABASE_URL.
+        port (int): Port to listen on.
+        log_file: File object receiving the server's output.
+
+    Raises:
+        RuntimeError: If the server does not come up within 30 seconds.
+
+    Returns:
+        subprocess.Popen: The server process.
+    """
+    env = dict(os.environ, DATABASE_URL=db_url, DATABASE_ECHO="0", PYTHONPATH=".")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.loadtest:create_app", "--factory", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=log_file, stderr=subprocess.STDOUT,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/summary", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not start within 30 seconds")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the finance tracker.")
+    parser.add_argument("--requests", type=int, default=2000, help="total requests to send")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="route weights, e.g. add=4,summary=2")
+    parser.add_argument("--seed-transactions", type=int, default=1000)
+    parser.add_argument("--seed-incomes", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--url", help="run against an already running server instead")
+    args = parser.parse_args(argv)
+
+    weights = parse_mix(args.mix)
+
+    if args.url:
+        print(format_report(*asyncio.run(run_load(args.url, weights, args.requests, args.concurrency, []))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'loadtest.db')}"
+        deletable = seed_database(db_url, args.seed_transactions, args.seed_incomes)
+        log_path = os.path.join(tmp, "server.log")
+        with open(log_path, "w") as log_file:
+            proc = start_server(db_url, args.port, log_file)
+            try:
+                stats, elapsed = asyncio.run(run_load(
+                    f"http://127.0.0.1:{args.port}", weights, args.requests, args.concurrency, deletable,
+                ))
+            finally:
+                proc.terminate()
+                proc.wait()
+        with open(log_path) as log_file:
+            server_locks = log_file.read().count(LOCK_ERROR)
+
+    print(format_report(stats, elapsed))
+    print(f"\n'{LOCK_ERROR}' in server log: {server_locks}")
+
+if __name__ == "__main__":
+    main()
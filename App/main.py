@@ -3,18 +3,34 @@ from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app import transactions 
-from app.database import SessionLocal, Base, engine
-from app.models import CategoryEnum, Income
+from app import audit
+from app.database import SessionLocal, Base, engine, BASE_CURRENCY
+from app.models import CategoryEnum
+from app.group_commit import GroupCommitWriter, GROUP_COMMIT_MS
+from app.currency import normalize_currency, upgrade_schema
 from pydantic import BaseModel
 from datetime import date
 import os
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 
 
 
-app = FastAPI()
+# Batches /add and /add_income inserts when GROUP_COMMIT_MS is set
+group_writer = GroupCommitWriter(SessionLocal) if GROUP_COMMIT_MS > 0 else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with SessionLocal() as db:
+        audit.ensure_baseline(db)
+    yield
+    if group_writer is not None:
+        group_writer.close()
+
+app = FastAPI(lifespan=lifespan)
 
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__)) 
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
@@ -36,10 +52,12 @@ class TransactionCreate(BaseModel):
     amount: float
     category: CategoryEnum
     date: date
+    currency: str = BASE_CURRENCY
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+templates.env.globals["base_currency"] = BASE_CURRENCY
 
 # ----------------- ROUTES -------------------
 
@@ -60,7 +78,8 @@ def add_transaction(
     name: str = Form(None),
     amount: float = Form(None),
     category: str = Form(None),
-    date: date = Form(None)
+    date: date = Form(None),
+    currency: str = Form(None)
 ):
     """
     Show the add transaction form (GET) and process submission (POST).
@@ -81,11 +100,12 @@ def add_transaction(
             name=name,
             amount=amount,
             category=CategoryEnum(category),
-            date=date
+            date=date,
+            currency=currency or BASE_CURRENCY
         )
         data = transaction_data.dict()
         data["date_"] = data.pop("date") 
-        transactions.add_transaction(db, **data)
+        transactions.add_transaction(db, **data, writer=group_writer)
         return RedirectResponse(url="/", status_code=303)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -98,7 +118,7 @@ def view_transactions(request: Request, db: Session = Depends(get_db)):
     Render a page displaying all transactions and income records.
     """
     all_txns = transactions.get_all_transactions(db)
-    all_income = db.query(Income).order_by(Income.date.desc()).all()
+    all_income = transactions.get_all_incomes(db)
     return templates.TemplateResponse("transactions.html", {
         "request": request,
         "transactions": all_txns,
@@ -108,18 +128,22 @@ def view_transactions(request: Request, db: Session = Depends(get_db)):
 
 # 4. Get summary 
 @app.get("/summary", response_class=HTMLResponse)
-def get_summary(request: Request, db: Session = Depends(get_db)):
+def get_summary(request: Request, db: Session = Depends(get_db), currency: str = BASE_CURRENCY):
     """
-    Render the summary page with totals, pie chart, and daily chart.
+    Render the summary page with totals, pie chart, and daily chart,
+    converted into the requested currency.
     """
-    data = transactions.get_summary(db)
-    summary_data = transactions.get_summary(db)
-    pie_img = transactions.get_spending_pie_chart(db)
-    line_img = transactions.get_daily_spending_chart(db)
+    try:
+        data = transactions.get_summary(db, currency=currency)
+        pie_img = transactions.get_spending_pie_chart(db, currency=currency)
+        line_img = transactions.get_daily_spending_chart(db, currency=currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return templates.TemplateResponse("summary.html", {
         "request": request,
         "summary": data,
+        "currency": normalize_currency(currency),
         "pie_chart": pie_img,
         "line_chart": line_img,
     })
@@ -181,26 +205,33 @@ def budget_summary(
     request: Request,
     db: Session = Depends(get_db),
     total_budget: float = Form(None),
-    end_date: date = Form(None)
+    end_date: date = Form(None),
+    currency: str = Form(None)
 ):
     """
     Show and calculate daily and remaining budget based on inputs.
+    Spending is converted into the budget's currency.
     """
     daily = None
     remaining = None
     if total_budget is not None and total_budget < 0:
         raise HTTPException(status_code=400, detail="Total budget cannot be negative")
-    
-    if request.method == "POST" and total_budget and end_date:
-        daily = transactions.get_daily_budget(db, total_budget, date.today(), end_date)
-        remaining = transactions.get_remaining_budget(db, total_budget)
+
+    try:
+        currency = normalize_currency(currency)
+        if request.method == "POST" and total_budget and end_date:
+            daily = transactions.get_daily_budget(db, total_budget, date.today(), end_date)
+            remaining = transactions.get_remaining_budget(db, total_budget, currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return templates.TemplateResponse("budget_summary.html", {
         "request": request,
         "daily_budget": daily,
         "remaining_budget": remaining,
         "total_budget": total_budget,
-        "end_date": end_date
+        "end_date": end_date,
+        "currency": currency
     })
 
 # 8. Add Income
@@ -209,7 +240,8 @@ def add_income(
     request: Request,
     db: Session = Depends(get_db),
     amount: float = Form(None),
-    date_: date = Form(None)
+    date_: date = Form(None),
+    currency: str = Form(None)
 ):
     """
     Show form to add income (GET), and add income record (POST).
@@ -223,9 +255,12 @@ def add_income(
             "error": "Please enter a valid positive amount."
         })
     
-    income_record = Income(amount=amount, date=date_)
-    db.add(income_record)
-    db.commit()
-    db.refresh(income_record)
+    try:
+        transactions.add_income_record(db, amount, date_, currency, writer=group_writer)
+    except ValueError as e:
+        return templates.TemplateResponse("add_income.html", {
+            "request": request,
+            "error": str(e)
+        })
 
     return RedirectResponse(url="/", status_code=303) 
\ No newline at end of file
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Enum
-from app.database import Base
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum, Text, Boolean
+from app.database import Base, BASE_CURRENCY
 import enum
 
 class CategoryEnum(enum.Enum):
@@ -22,6 +22,7 @@ class Transaction(Base):
         amount (float): Amount of the transaction.
         category (CategoryEnum): Category of the transaction.
         date (date): Date of the transaction.
+        currency (str): ISO 4217 code of the amount's currency.
     """
     __tablename__ = 'transactions'
 
@@ -30,6 +31,7 @@ class Transaction(Base):
     amount = Column(Float, nullable=False)
     category = Column(Enum(CategoryEnum), nullable=False)
     date = Column(Date, nullable=False)
+    currency = Column(String(3), nullable=False, default=BASE_CURRENCY)
     
 class Income(Base):
     """
@@ -39,9 +41,65 @@ class Income(Base):
         id (int): Primary key.
         amount (float): Income amount.
         date (date): Date of income.
+        currency (str): ISO 4217 code of the amount's currency.
     """
     __tablename__ = "income"
 
     id =  Column(Integer, primary_key=True, index=True)
     amount = Column(Float, nullable=False)
-    date = Column(Date, nullable=False)
\ No newline at end of file
+    date = Column(Date, nullable=False)
+    currency = Column(String(3), nullable=False, default=BASE_CURRENCY)
+
+class LedgerEvent(Base):
+    """
+    Append-only log entry for a change to the ledger.
+
+    Each insert or delete of a transaction or income row records one event.
+    The event id is the ledger version the change produced.
+
+    Attributes:
+        version (int): Primary key; increases by one per change.
+        kind (str): "insert" or "delete".
+        entity (str): "transaction" or "income".
+        entity_id (int): ID of the affected row.
+        amount (float): Amount of the affected row.
+        category (CategoryEnum): Category of the affected transaction, None for income.
+        date (date): Date of the affected row.
+        currency (str): Currency of the affected row.
+        recorded_at (datetime): When the change was recorded.
+    """
+    __tablename__ = "ledger_events"
+
+    version = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    amount = Column(Float, nullable=False)
+    category = Column(Enum(CategoryEnum), nullable=True)
+    date = Column(Date, nullable=False)
+    currency = Column(String(3), nullable=False, default=BASE_CURRENCY)
+    recorded_at = Column(DateTime, nullable=False, index=True)
+
+class LedgerSnapshot(Base):
+    """
+    Daily aggregates of the ledger, either in full or as the change since the
+    previous snapshot.
+
+    Adding up the last full snapshot and the deltas after it, up to a version,
+    gives the aggregates at that version.
+
+    Attributes:
+        version (int): Ledger version the snapshot ends at.
+        created_at (datetime): When the snapshot was taken.
+        full (bool): True if buckets hold the whole aggregates rather than a
+            delta.
+        buckets (str): JSON list of [entity, category name, currency, date,
+            total, row count], one per day, category and currency (for a
+            delta, only those touched since the previous snapshot).
+    """
+    __tablename__ = "ledger_snapshots"
+
+    version = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+    full = Column(Boolean, nullable=False, default=False)
+    buckets = Column(Text, nullable=False)
\ No newline at end of file
@@ -0,0 +1,159 @@
+import unittest
+from unittest import mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, CategoryEnum, Income, LedgerEvent, LedgerSnapshot
+from datetime import date, datetime
+from app import transactions
+from app import audit
+
+class TestAudit(unittest.TestCase):
+    """
+    Test case for the audit log and point-in-time summaries.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Set up an in-memory SQLite database shared by all tests.
+        """
+        cls.engine = create_engine('sqlite:///:memory:')
+        cls.Session = sessionmaker(bind=cls.engine)
+
+    def setUp(self):
+        """
+        Runs before each test method.
+        - Recreates the tables and starts a new session.
+        """
+        Base.metadata.drop_all(bind=self.engine)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.__class__.Session()
+
+    def tearDown(self):
+        """
+        Runs after each test method.
+        - Closes the database session.
+        """
+        self.db.close()
+
+    def test_events_recorded(self):
+        """
+        Tests that inserts and deletes append versioned events.
+        """
+        txn = transactions.add_transaction(self.db, "Lunch", 15.00, CategoryEnum.FOOD, date(2025, 7, 8))
+        transactions.delete_transaction(self.db, txn.id)
+
+        events = self.db.query(LedgerEvent).order_by(LedgerEvent.version).all()
+        self.assertEqual([(e.version, e.kind, e.entity_id) for e in events], [(1, "insert", txn.id), (2, "delete", txn.id)])
+        self.assertEqual(audit.current_version(self.db), 2)
+
+    def test_summary_as_of_version(self):
+        """
+        Tests that get_summary reports totals as they were at an earlier version.
+        """
+        lunch = transactions.add_transaction(self.db, "Lunch", 15.00, CategoryEnum.FOOD, date(2025, 7, 8))
+        transactions.add_transaction(self.db, "Movie", 12.00, CategoryEnum.FUN, date(2025, 7, 8))
+        transactions.delete_transaction(self.db, lunch.id)
+
+        self.assertEqual(transactions.get_summary(self.db)["total_expenses"], 12.00)
+        self.assertEqual(transactions.get_summary(self.db, as_of=2)["total_expenses"], 27.00)
+        self.assertEqual(transactions.get_summary(self.db, as_of=1)["total_expenses"], 15.00)
+        self.assertEqual(
+            transactions.get_category_totals(self.db, as_of=2),
+            {CategoryEnum.FOOD: 15.00, CategoryEnum.FUN: 12.00},
+        )
+        self.assertEqual(transactions.get_category_totals(self.db, as_of=3), {CategoryEnum.FUN: 12.00})
+
+    def test_summary_as_of_date(self):
+        """
+        Tests that a date resolves to the last version recorded on or before it.
+        """
+        with mock.patch("app.audit.datetime") as fake_datetime:
+            fake_datetime.now.return_value = datetime(2025, 6, 30, 12, 0)
+            fake_datetime.combine = datetime.combine
+            transactions.add_transaction(self.db, "Rent", 800.00, CategoryEnum.UTILITIES, date(2025, 6, 30))
+            fake_datetime.now.return_value = datetime(2025, 7, 2, 9, 0)
+            transactions.add_transaction(self.db, "Bus", 2.50, CategoryEnum.TRANSPORT, date(2025, 7, 2))
+
+        self.assertEqual(transactions.get_summary(self.db, as_of=date(2025, 6, 30))["total_expenses"], 800.00)
+        self.assertEqual(transactions.get_summary(self.db, as_of=date(2025, 6, 29))["total_expenses"], 0)
+
+    def test_replays_from_snapshot(self):
+        """
+        Tests that snapshots store only changes since the previous one and add
+        up to the right totals.
+        """
+        with mock.patch("app.audit.SNAPSHOT_EVERY", 2):
+            first = transactions.add_transaction(self.db, "Item 0", 10, CategoryEnum.MISC, date(2025, 7, 8))
+            for i in range(1, 4):
+                transactions.add_transaction(self.db, f"Item {i}", 10, CategoryEnum.MISC, date(2025, 7, 8))
+            transactions.delete_transaction(self.db, first.id)
+            transactions.add_transaction(self.db, "Late", 5, CategoryEnum.FUN, date(2025, 7, 9))
+
+        key = ("transaction", CategoryEnum.MISC, "USD", date(2025, 7, 8))
+        snapshots = self.db.query(LedgerSnapshot).order_by(LedgerSnapshot.version).all()
+        deltas = {s.version: audit.LedgerAggregates.from_json(s.version, s.buckets).buckets for s in snapshots}
+        self.assertEqual(deltas, {
+            2: {key: [20, 2]},
+            4: {key: [20, 2]},
+            6: {key: [-10, -1], ("transaction", CategoryEnum.FUN, "USD", date(2025, 7, 9)): [5, 1]},
+        })
+
+        self.assertEqual(audit.aggregates_as_of(self.db, 5).buckets, {key: [30, 3]})
+        self.assertEqual(transactions.get_summary(self.db, as_of=6)["total_expenses"], 35)
+        self.assertEqual(transactions.get_summary(self.db, as_of=3)["total_expenses"], 30)
+
+    def test_delta_keeps_bucket_with_no_net_rows(self):
+        """
+        Tests that a snapshot window with an insert and a delete of different
+        rows in the same bucket keeps the change in total.
+        """
+        with mock.patch("app.audit.SNAPSHOT_EVERY", 2):
+            old = transactions.add_transaction(self.db, "Old", 20, CategoryEnum.FOOD, date(2025, 7, 8))
+            transactions.add_transaction(self.db, "Film", 5, CategoryEnum.FUN, date(2025, 7, 8))
+            transactions.add_transaction(self.db, "New", 10, CategoryEnum.FOOD, date(2025, 7, 8))
+            transactions.delete_transaction(self.db, old.id)
+
+        key = ("transaction", CategoryEnum.FOOD, "USD", date(2025, 7, 8))
+        snapshot = self.db.query(LedgerSnapshot).filter(LedgerSnapshot.version == 4).one()
+        self.assertEqual(audit.LedgerAggregates.from_json(4, snapshot.buckets).buckets, {key: [-10, 0]})
+
+        self.assertEqual(transactions.get_summary(self.db, as_of=4)["total_expenses"], 15)
+        self.assertEqual(
+            transactions.get_category_totals(self.db, as_of=4),
+            {CategoryEnum.FOOD: 10, CategoryEnum.FUN: 5},
+        )
+
+    def test_reads_start_from_full_snapshot(self):
+        """
+        Tests that every third snapshot is a full checkpoint and that "as of"
+        reads only load snapshots from the last checkpoint on.
+        """
+        with mock.patch("app.audit.SNAPSHOT_EVERY", 1), mock.patch("app.audit.FULL_SNAPSHOT_EVERY", 3):
+            first = transactions.add_transaction(self.db, "Item 0", 10, CategoryEnum.MISC, date(2025, 7, 8))
+            for i in range(1, 6):
+                transactions.add_transaction(self.db, f"Item {i}", 10, CategoryEnum.MISC, date(2025, 7, 8))
+            transactions.delete_transaction(self.db, first.id)
+
+        snapshots = self.db.query(LedgerSnapshot).order_by(LedgerSnapshot.version).all()
+        self.assertEqual([s.version for s in snapshots if s.full], [3, 6])
+        key = ("transaction", CategoryEnum.MISC, "USD", date(2025, 7, 8))
+        self.assertEqual(audit.LedgerAggregates.from_json(6, snapshots[5].buckets).buckets, {key: [60, 6]})
+
+        with mock.patch.object(audit.LedgerAggregates, "from_json", wraps=audit.LedgerAggregates.from_json) as loads:
+            self.assertEqual(audit.aggregates_as_of(self.db, 7).buckets, {key: [50, 5]})
+        self.assertEqual([c.args[0] for c in loads.call_args_list], [6, 7])
+        self.assertEqual(transactions.get_summary(self.db, as_of=5)["total_expenses"], 50)
+
+    def test_baseline_for_existing_rows(self):
+        """
+        Tests that rows written before the audit log existed become snapshot 0.
+        """
+        self.db.add(Income(amount=500, date=date(2025, 7, 1)))
+        self.db.commit()
+        audit.ensure_baseline(self.db)
+
+        self.assertEqual(transactions.get_summary(self.db, as_of=0)["total_income"], 500)
+
+if __name__ == '__main__':
+    unittest.main()
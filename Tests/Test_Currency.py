@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, CategoryEnum
+from app.currency import FxRates, normalize_currency
+from app import currency as currency_module
+from datetime import date
+from app import transactions
+
+RATES = """date,currency,rate
+2025-07-01,EUR,1.10
+2025-07-05,EUR,1.20
+2025-07-01,GBP,1.25
+"""
+
+class TestCurrency(unittest.TestCase):
+    """
+    Test case for multi-currency amounts and FX conversion.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Set up an in-memory SQLite database shared by all tests.
+        """
+        cls.engine = create_engine('sqlite:///:memory:')
+        cls.Session = sessionmaker(bind=cls.engine)
+
+    def setUp(self):
+        """
+        Runs before each test method.
+        - Recreates the tables and points the converter at a temporary rates file.
+        """
+        Base.metadata.drop_all(bind=self.engine)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.__class__.Session()
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "fx_rates.csv")
+        with open(path, "w") as f:
+            f.write(RATES)
+        self.rates = FxRates(path)
+        patcher = mock.patch.object(currency_module, "fx_rates", self.rates)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """
+        Runs after each test method.
+        - Closes the session and removes the rates file.
+        """
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_normalize_currency(self):
+        """
+        Tests that codes are upper-cased and invalid ones rejected.
+        """
+        self.assertEqual(normalize_currency("eur"), "EUR")
+        self.assertEqual(normalize_currency(None), "USD")
+        with self.assertRaises(ValueError):
+            normalize_currency("EURO")
+
+    def test_rates_use_latest_earlier_date(self):
+        """
+        Tests that each day uses the latest rate on or before it.
+        """
+        self.rates.refresh()
+        days = [date(2025, 6, 1), date(2025, 7, 3), date(2025, 7, 5), date(2025, 8, 1)]
+        rates = self.rates.rates("EUR", [d.toordinal() for d in days])
+        self.assertEqual(list(rates), [1.10, 1.10, 1.20, 1.20])
+
+    def test_summary_converts_at_row_dates(self):
+        """
+        Tests that amounts are converted with the rate of their own day.
+        """
+        transactions.add_transaction(self.db, "Lunch", 10, CategoryEnum.FOOD, date(2025, 7, 2), currency="eur")
+        transactions.add_transaction(self.db, "Dinner", 10, CategoryEnum.FOOD, date(2025, 7, 6), currency="EUR")
+        transactions.add_transaction(self.db, "Bus", 5, CategoryEnum.TRANSPORT, date(2025, 7, 6))
+
+        summary = transactions.get_summary(self.db)
+        self.assertEqual(summary["total_expenses"], 28.00)
+        self.assertEqual(
+            transactions.get_category_totals(self.db),
+            {CategoryEnum.FOOD: 23.00, CategoryEnum.TRANSPORT: 5.00},
+        )
+        in_gbp = transactions.get_summary(self.db, currency="GBP")
+        self.assertEqual(in_gbp["total_expenses"], 22.40)
+        self.assertEqual(transactions.get_remaining_budget(self.db, 30), 2.00)
+
+    def test_income_converted(self):
+        """
+        Tests that income in another currency is converted too.
+        """
+        transactions.add_income_record(self.db, 100, date(2025, 7, 1), currency="GBP")
+
+        self.assertEqual(transactions.get_summary(self.db)["total_income"], 125.00)
+        self.assertEqual(transactions.get_summary(self.db, as_of=1)["total_income"], 125.00)
+
+    def test_missing_rate_rejected_on_write(self):
+        """
+        Tests that rows in a currency with no rates are rejected, so they can't
+        break later aggregations.
+        """
+        with self.assertRaises(ValueError):
+            transactions.add_transaction(self.db, "Sushi", 1000, CategoryEnum.FOOD, date(2025, 7, 2), currency="JPY")
+        with self.assertRaises(ValueError):
+            transactions.add_income_record(self.db, 1000, date(2025, 7, 2), currency="JPY")
+
+        self.assertEqual(transactions.get_all_transactions(self.db), [])
+        self.assertEqual(transactions.get_summary(self.db)["total_expenses"], 0)
+
+    def test_unknown_reporting_currency_raises(self):
+        """
+        Tests that reporting in a currency with no rates raises ValueError.
+        """
+        with self.assertRaises(ValueError):
+            transactions.get_remaining_budget(self.db, 100, currency="JPY")
+
+    def test_converted_ledger_memoized(self):
+        """
+        Tests that conversions are reused until the ledger changes.
+        """
+        transactions.add_transaction(self.db, "Lunch", 10, CategoryEnum.FOOD, date(2025, 7, 2), currency="EUR")
+        first = currency_module.converted_ledger(self.db, "USD")
+        self.assertIs(currency_module.converted_ledger(self.db, "usd"), first)
+
+        transactions.add_transaction(self.db, "Dinner", 10, CategoryEnum.FOOD, date(2025, 7, 2), currency="EUR")
+        self.assertIsNot(currency_module.converted_ledger(self.db, "USD"), first)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, Transaction, CategoryEnum, Income, LedgerEvent
+from app.group_commit import GroupCommitWriter
+from datetime import date
+from app import transactions
+
+class TestGroupCommit(unittest.TestCase):
+    """
+    Test case for the batching group-commit writer.
+    """
+
+    def setUp(self):
+        """
+        Runs before each test method.
+        - Creates a file-backed SQLite database the writer thread can share.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'test.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+        self.writer = GroupCommitWriter(self.Session, max_delay_ms=20, max_rows=50)
+
+    def tearDown(self):
+        """
+        Runs after each test method.
+        - Stops the writer and removes the database.
+        """
+        self.writer.close()
+        self.db.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_add_transaction_through_writer(self):
+        """
+        Tests that add_transaction returns a committed row with an id.
+        """
+        txn = transactions.add_transaction(
+            self.db, "Lunch", 12.50, CategoryEnum.FOOD, date(2025, 7, 8), writer=self.writer
+        )
+        self.assertIsNotNone(txn.id)
+        self.assertEqual(txn.name, "Lunch")
+        self.assertEqual(self.db.query(Transaction).count(), 1)
+
+    def test_concurrent_submissions_get_distinct_ids(self):
+        """
+        Tests that rows submitted from many threads all commit with unique ids.
+        """
+        def submit(i):
+            return self.writer.submit(
+                Transaction(name=f"Item {i}", amount=i, category=CategoryEnum.MISC, date=date(2025, 7, 8))
+            ).result()
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            ids = list(pool.map(submit, range(200)))
+
+        self.assertEqual(len(set(ids)), 200)
+        self.assertEqual(self.db.query(Transaction).count(), 200)
+
+    def test_bad_row_does_not_fail_batch(self):
+        """
+        Tests that a row violating a constraint fails alone.
+        """
+        good = self.writer.submit(Income(amount=100, date=date(2025, 7, 8)))
+        bad = self.writer.submit(Income(amount=None, date=date(2025, 7, 8)))
+
+        self.assertIsNotNone(good.result())
+        with self.assertRaises(Exception):
+            bad.result()
+        self.assertEqual(self.db.query(Income).count(), 1)
+
+    def test_post_commit_error_does_not_retry(self):
+        """
+        Tests that a failing cache hook after commit does not re-insert the batch.
+        """
+        with mock.patch("app.group_commit.cache_inserts", side_effect=RuntimeError("boom")):
+            futures = [
+                self.writer.submit(Income(amount=10 + i, date=date(2025, 7, 8))) for i in range(3)
+            ]
+            ids = [f.result() for f in futures]
+
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(self.db.query(Income).count(), 3)
+        self.assertEqual(self.db.query(LedgerEvent).count(), 3)
+        self.assertIsNotNone(self.writer.submit(Income(amount=1, date=date(2025, 7, 8))).result(timeout=5))
+
+if __name__ == '__main__':
+    unittest.main()
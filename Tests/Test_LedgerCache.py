@@ -0,0 +1,116 @@
+import unittest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, Transaction, CategoryEnum
+from app.ledger_cache import ledger_cache, LedgerRow
+from datetime import date
+from app import transactions
+
+class TestLedgerCache(unittest.TestCase):
+    """
+    Test case for the in-process ledger cache and its write-through hooks.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Set up an in-memory SQLite database shared by all tests.
+        """
+        cls.engine = create_engine('sqlite:///:memory:')
+        cls.Session = sessionmaker(bind=cls.engine)
+
+    def setUp(self):
+        """
+        Runs before each test method.
+        - Recreates the tables and enables the cache with a small cap.
+        """
+        Base.metadata.drop_all(bind=self.engine)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.__class__.Session()
+        self.old_max_rows = ledger_cache.max_rows
+        ledger_cache.max_rows = 5
+        ledger_cache.reset()
+
+    def tearDown(self):
+        """
+        Runs after each test method.
+        - Closes the session and restores the cache settings.
+        """
+        self.db.close()
+        ledger_cache.max_rows = self.old_max_rows
+        ledger_cache.reset()
+
+    def test_reads_served_from_cache(self):
+        """
+        Tests that reads return cached rows and see later writes.
+        """
+        transactions.add_transaction(self.db, "Lunch", 15.00, CategoryEnum.FOOD, date(2025, 7, 8))
+        all_txns = transactions.get_all_transactions(self.db)
+        self.assertIsInstance(all_txns[0], LedgerRow)
+
+        transactions.add_transaction(self.db, "Bus", 2.50, CategoryEnum.TRANSPORT, date(2025, 7, 9))
+        self.assertEqual([t.name for t in transactions.get_all_transactions(self.db)], ["Lunch", "Bus"])
+        self.assertEqual([t.name for t in transactions.get_by_category(self.db, "FOOD")], ["Lunch"])
+
+        summary = transactions.get_summary(self.db)
+        self.assertEqual(summary["total_expenses"], 17.50)
+
+    def test_delete_invalidates_row(self):
+        """
+        Tests that a deleted transaction disappears from every index.
+        """
+        txn = transactions.add_transaction(self.db, "Snack", 3, CategoryEnum.FOOD, date(2025, 7, 8))
+        transactions.get_all_transactions(self.db)
+        self.assertTrue(transactions.delete_transaction(self.db, txn.id))
+
+        self.assertEqual(transactions.get_all_transactions(self.db), [])
+        self.assertEqual(transactions.get_by_category(self.db, CategoryEnum.FOOD), [])
+
+    def test_income_hook(self):
+        """
+        Tests that income rows recorded through the hook show up in the listing.
+        """
+        transactions.get_all_incomes(self.db)
+        transactions.add_income_record(self.db, 100, date(2025, 7, 8))
+
+        incomes = transactions.get_all_incomes(self.db)
+        self.assertEqual([inc.amount for inc in incomes], [100])
+        self.assertEqual(transactions.get_summary(self.db)["total_income"], 100)
+
+    def test_falls_back_to_sql_past_cap(self):
+        """
+        Tests that the cache gives up once the ledger exceeds max_rows.
+        """
+        for i in range(6):
+            transactions.add_transaction(self.db, f"Item {i}", 1, CategoryEnum.MISC, date(2025, 7, 8))
+
+        all_txns = transactions.get_all_transactions(self.db)
+        self.assertEqual(len(all_txns), 6)
+        self.assertIsInstance(all_txns[0], Transaction)
+
+    def test_summary_served_without_sql(self):
+        """
+        Tests that once the cache is loaded, the summary runs no SQL and still
+        sees later writes.
+        """
+        transactions.add_transaction(self.db, "Lunch", 15.00, CategoryEnum.FOOD, date(2025, 7, 8))
+        transactions.get_summary(self.db)
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            summary = transactions.get_summary(self.db)
+            totals = transactions.get_category_totals(self.db)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+
+        self.assertEqual(statements, [])
+        self.assertEqual(summary["total_expenses"], 15.00)
+        self.assertEqual(totals, {CategoryEnum.FOOD: 15.00})
+
+        transactions.add_transaction(self.db, "Bus", 2.50, CategoryEnum.TRANSPORT, date(2025, 7, 9))
+        self.assertEqual(transactions.get_summary(self.db)["total_expenses"], 17.50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+from unittest import mock
+import httpx
+from app import loadtest
+
+class TestLoadTest(unittest.TestCase):
+    """
+    Test case for the helpers in the load-testing harness.
+    """
+
+    def test_parse_mix(self):
+        """
+        Tests that a route mix string is parsed into weights.
+        """
+        weights = loadtest.parse_mix("add=3, summary=1")
+        self.assertEqual(weights, {"add": 3, "summary": 1})
+
+    def test_parse_mix_rejects_bad_input(self):
+        """
+        Tests that unknown routes and non-positive weights raise ValueError.
+        """
+        with self.assertRaises(ValueError):
+            loadtest.parse_mix("refund=1")
+        with self.assertRaises(ValueError):
+            loadtest.parse_mix("add=0")
+
+    def test_percentile(self):
+        """
+        Tests nearest-rank percentiles on 1..100.
+        """
+        values = list(range(100, 0, -1))
+        self.assertEqual(loadtest.percentile(values, 50), 50)
+        self.assertEqual(loadtest.percentile(values, 99), 99)
+        self.assertEqual(loadtest.percentile(values, 100), 100)
+        self.assertEqual(loadtest.percentile([], 50), 0.0)
+
+    def test_run_load_sends_all_requests_without_deletable_ids(self):
+        """
+        Tests that delete is dropped from the mix instead of eating the request budget.
+        """
+        sent = []
+
+        async def fake_request(self, method, path, data=None):
+            sent.append(path)
+            return httpx.Response(200, text="ok")
+
+        with mock.patch.object(httpx.AsyncClient, "request", fake_request):
+            stats, _ = asyncio.run(loadtest.run_load("http://test", {"summary": 1, "delete": 5}, 50, 4, []))
+
+        self.assertEqual(len(sent), 50)
+        self.assertEqual(len(stats["summary"]["latencies"]), 50)
+        self.assertEqual(stats["delete"]["latencies"], [])
+
+if __name__ == '__main__':
+    unittest.main()